@@ -94,28 +94,46 @@ RESPONSES = {
     "project_create": "I can help you create a new project across GitHub and GitLab with synchronized repositories. Would you like me to walk you through the process?"
 }
 
+# Lowest cosine similarity accepted as a match; below it the reply falls back to "help".
+# Queries sharing no word with the training data score 0, genuine matches score about 0.45 or more
+MIN_SIMILARITY = 0.3
+
+# Lazily-built matching index, shared by every call to process_message
+_model = None
+
+def load_model():
+    """Build the training-data index once and return the cached copy."""
+    global _model
+    if _model is None:
+        # Imported lazily so app startup doesn't pay for scikit-learn
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        logger.info("Building AI model index from training data")
+        # The default word tokenizer drops punctuation and one-letter words such as "a"
+        vectorizer = TfidfVectorizer(lowercase=True)
+        _model = {
+            "vectorizer": vectorizer,
+            "matrix": vectorizer.fit_transform([query for query, _ in TRAINING_DATA]),
+            "intents": [intent for _, intent in TRAINING_DATA],
+        }
+    return _model
+
 def find_most_similar_query(user_text):
-    """Find the most similar query in our training data using simple word matching."""
-    user_words = set(user_text.lower().split())
+    """Find the most similar query in our training data using TF-IDF cosine similarity."""
+    from sklearn.metrics.pairwise import linear_kernel
     
-    best_match = None
-    highest_score = 0
+    model = load_model()
+    user_vector = model["vectorizer"].transform([user_text])
     
-    for query, intent in TRAINING_DATA:
-        query_words = set(query.lower().split())
-        # Calculate a simple similarity score based on word overlap
-        common_words = user_words.intersection(query_words)
-        score = len(common_words) / (len(user_words) + len(query_words) - len(common_words))
-        
-        if score > highest_score:
-            highest_score = score
-            best_match = intent
+    # Rows are L2-normalized, so the linear kernel is the cosine similarity
+    scores = linear_kernel(user_vector, model["matrix"])[0]
+    best = int(scores.argmax())
     
     # Return a default intent if no good match is found
-    if highest_score < 0.2:
+    if scores[best] < MIN_SIMILARITY:
         return "help"
     
-    return best_match
+    return model["intents"][best]
 
 def process_message(message):
     """Process a user message and return an appropriate response."""
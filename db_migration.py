@@ -14,12 +14,25 @@ from sqlalchemy import inspect, Column, String
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Inspector reused across checks so table reflection is cached; dropped after any DDL
+_inspector = None
+
+def _get_inspector():
+    """Return a cached Inspector for the application's engine."""
+    global _inspector
+    if _inspector is None:
+        _inspector = inspect(db.engine)
+    return _inspector
+
+def _drop_inspector():
+    """Forget the cached Inspector so the next check reflects schema changes made since."""
+    global _inspector
+    _inspector = None
+
 def column_exists(table_name, column_name):
     """Check if a column exists in a table."""
     with app.app_context():
-        inspector = inspect(db.engine)
-        columns = [col['name'] for col in inspector.get_columns(table_name)]
-        return column_name in columns
+        return any(col['name'] == column_name for col in _get_inspector().get_columns(table_name))
 
 def add_github_id_column():
     """Add the github_id column to the User table if it doesn't exist."""
@@ -28,9 +41,9 @@ def add_github_id_column():
             # Check if the column already exists
             if not column_exists('user', 'github_id'):
                 logger.info("Adding 'github_id' column to the User table...")
-                conn = db.engine.connect()
-                conn.execute(db.text("ALTER TABLE \"user\" ADD COLUMN github_id VARCHAR(64) UNIQUE"))
-                conn.close()
+                with db.engine.begin() as conn:
+                    conn.execute(db.text("ALTER TABLE \"user\" ADD COLUMN github_id VARCHAR(64) UNIQUE"))
+                _drop_inspector()
                 logger.info("Column 'github_id' added successfully!")
             else:
                 logger.info("Column 'github_id' already exists in the User table.")
@@ -1,8 +1,15 @@
 import os
+import base64
 import requests
 import logging
 import json
-from flask import current_app
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -11,8 +18,46 @@ logger = logging.getLogger(__name__)
 # Base URL for GitHub API
 GITHUB_API_BASE_URL = "https://api.github.com"
 
+# Shared session so repeated calls reuse pooled keep-alive connections
+_session = requests.Session()
+_session.headers.update({"Accept": "application/vnd.github.v3+json"})
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    )
+)
+
+# Headers shared by every request; only Authorization varies per call
+_STATIC_HEADERS = {
+    "Accept": "application/vnd.github.v3+json",
+    "Content-Type": "application/json"
+}
+
+_METHOD_DISPATCH = {
+    "GET": _session.get,
+    "POST": _session.post,
+    "PUT": _session.put,
+    "DELETE": _session.delete,
+}
+
+# Last ETag and parsed body per GET (token fingerprint, url, params), used for conditional requests;
+# least recently used entries are evicted past ETAG_CACHE_SIZE
+ETAG_CACHE_SIZE = 256
+_etag_cache = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
+# Token resolved by the first successful get_github_token() call
+_github_token = None
+
 def get_github_token():
     """Get the GitHub API token from the environment or the Flask app config."""
+    global _github_token
+    if _github_token:
+        return _github_token
+    
     token = os.environ.get("GITHUB_TOKEN")
     
     # Alternative environment variable names
@@ -20,18 +65,14 @@ def get_github_token():
         token = os.environ.get("GH_TOKEN")
     
     # If not found in environment, try to get from Flask app config
-    if not token:
-        try:
-            if current_app:
-                token = current_app.config.get("GITHUB_TOKEN")
-        except RuntimeError:
-            # This happens when outside of Flask context
-            pass
+    if not token and has_app_context():
+        token = current_app.config.get("GITHUB_TOKEN")
     
     if not token:
         logger.error("GitHub API token not found in environment variables or app config")
         raise ValueError("GitHub API token not found in environment variables or app config")
     
+    _github_token = token
     return token
 
 def make_github_request(endpoint, method="GET", data=None, params=None):
@@ -39,31 +80,48 @@ def make_github_request(endpoint, method="GET", data=None, params=None):
     token = get_github_token()
     url = f"{GITHUB_API_BASE_URL}/{endpoint}"
     
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json",
-        "Content-Type": "application/json"
-    }
+    headers = {**_STATIC_HEADERS, "Authorization": f"token {token}"}
+    
+    request_fn = _METHOD_DISPATCH.get(method)
+    if request_fn is None:
+        raise ValueError(f"Unsupported HTTP method: {method}")
     
     try:
+        cached = None
         if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=data)
-        elif method == "PUT":
-            response = requests.put(url, headers=headers, json=data)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+            token_id = hashlib.sha256(token.encode()).hexdigest()[:16]
+            cache_key = (token_id, url, tuple(sorted((params or {}).items())))
+            with _etag_cache_lock:
+                cached = _etag_cache.get(cache_key)
+                if cached:
+                    _etag_cache.move_to_end(cache_key)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+        
+        response = request_fn(url, headers=headers, params=params, json=data, timeout=10)
+        
+        # Unchanged since the last fetch: reuse the cached body
+        if response.status_code == 304 and cached:
+            return cached[1]
         
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        
+        if method == "GET" and "ETag" in response.headers:
+            with _etag_cache_lock:
+                _etag_cache[cache_key] = (response.headers["ETag"], result)
+                _etag_cache.move_to_end(cache_key)
+                if len(_etag_cache) > ETAG_CACHE_SIZE:
+                    _etag_cache.popitem(last=False)
+        
+        return result
     
     except requests.exceptions.RequestException as e:
         logger.error(f"GitHub API request failed: {str(e)}")
-        if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            logger.error(f"Response content: {e.response.text}")
+        resp = getattr(e, "response", None)
+        text = getattr(resp, "text", "")
+        if text:
+            logger.error(f"Response content: {text}")
         raise
 
 def get_github_repositories():
@@ -95,11 +153,22 @@ def get_github_workflow_runs(owner, repo, workflow_id):
     """Get runs for a specific GitHub workflow."""
     return make_github_request(f"repos/{owner}/{repo}/actions/workflows/{workflow_id}/runs")
 
+def get_all_workflow_runs(owner, repo, max_workers=8):
+    """Get runs for every workflow in a repository, fetching them concurrently."""
+    workflows = get_github_workflows(owner, repo).get("workflows", [])
+    if not workflows:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda workflow: get_github_workflow_runs(owner, repo, workflow["id"]),
+            workflows
+        ))
+
 def create_github_workflow(owner, repo, workflow_name, workflow_content):
     """Create a new GitHub workflow file in the repository."""
     # Encode content to base64
-    import base64
-    encoded_content = base64.b64encode(workflow_content.encode()).decode()
+    encoded_content = base64.b64encode(workflow_content.encode("utf-8")).decode("ascii")
     
     return make_github_request(
         f"repos/{owner}/{repo}/contents/.github/workflows/{workflow_name}.yml",
@@ -1,8 +1,12 @@
 import os
+import secrets
 import requests
 import logging
+from functools import wraps
 from urllib.parse import urlencode
-from flask import current_app, redirect, url_for, request, session, flash
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app, g, redirect, url_for, request, session, flash
 import json
 
 # Configure logging
@@ -14,8 +18,23 @@ GITHUB_AUTH_URL = "https://github.com/login/oauth/authorize"
 GITHUB_TOKEN_URL = "https://github.com/login/oauth/access_token"
 GITHUB_API_BASE_URL = "https://api.github.com"
 
+# Shared session so OAuth and user-info calls reuse keep-alive connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# OAuth credentials cached after the first successful lookup
+_oauth_config = None
+
 def get_github_oauth_config():
     """Get GitHub OAuth client ID and secret from environment variables."""
+    global _oauth_config
+    if _oauth_config:
+        return _oauth_config
+    
     client_id = os.environ.get("GITHUB_CLIENT_ID") or current_app.config.get("GITHUB_CLIENT_ID")
     client_secret = os.environ.get("GITHUB_CLIENT_SECRET") or current_app.config.get("GITHUB_CLIENT_SECRET")
     
@@ -23,7 +42,23 @@ def get_github_oauth_config():
         logger.error("GitHub OAuth credentials not found. Using GITHUB_TOKEN for authentication instead.")
         return None, None
     
-    return client_id, client_secret
+    _oauth_config = (client_id, client_secret)
+    return _oauth_config
+
+def get_github_callback_url():
+    """Get the external URL of the GitHub OAuth callback, building it at most once."""
+    callback_url = current_app.config.get("GITHUB_CALLBACK_URL")
+    if callback_url:
+        return callback_url
+    
+    if "github_callback_url" not in g:
+        g.github_callback_url = url_for('github_callback', _external=True)
+    
+    # With a fixed SERVER_NAME the URL is the same for every request
+    if current_app.config.get("SERVER_NAME"):
+        current_app.config["GITHUB_CALLBACK_URL"] = g.github_callback_url
+    
+    return g.github_callback_url
 
 def get_github_login_url(callback_url=None):
     """Generate GitHub OAuth login URL."""
@@ -34,13 +69,13 @@ def get_github_login_url(callback_url=None):
         return None
     
     if not callback_url:
-        callback_url = url_for('github_callback', _external=True)
+        callback_url = get_github_callback_url()
     
     params = {
         'client_id': client_id,
         'redirect_uri': callback_url,
         'scope': 'user repo admin:repo_hook',  # Adjust scopes based on your needs
-        'state': os.urandom(16).hex()  # Random state to prevent CSRF
+        'state': secrets.token_hex(16)  # Random state to prevent CSRF
     }
     
     # Store state in session for verification
@@ -57,7 +92,7 @@ def get_github_token_from_code(code, callback_url=None):
         return None
     
     if not callback_url:
-        callback_url = url_for('github_callback', _external=True)
+        callback_url = get_github_callback_url()
     
     data = {
         'client_id': client_id,
@@ -71,7 +106,7 @@ def get_github_token_from_code(code, callback_url=None):
     }
     
     try:
-        response = requests.post(GITHUB_TOKEN_URL, data=data, headers=headers)
+        response = _session.post(GITHUB_TOKEN_URL, data=data, headers=headers)
         response.raise_for_status()
         
         # Parse the response
@@ -86,8 +121,10 @@ def get_github_token_from_code(code, callback_url=None):
     
     except requests.exceptions.RequestException as e:
         logger.error(f"Error exchanging code for token: {str(e)}")
-        if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            logger.error(f"Response content: {e.response.text}")
+        resp = getattr(e, "response", None)
+        text = getattr(resp, "text", "")
+        if text:
+            logger.error(f"Response content: {text}")
         return None
 
 def get_github_user_info(access_token):
@@ -102,20 +139,20 @@ def get_github_user_info(access_token):
     }
     
     try:
-        response = requests.get(f"{GITHUB_API_BASE_URL}/user", headers=headers)
+        response = _session.get(f"{GITHUB_API_BASE_URL}/user", headers=headers)
         response.raise_for_status()
         return response.json()
     
     except requests.exceptions.RequestException as e:
         logger.error(f"Error getting user info: {str(e)}")
-        if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            logger.error(f"Response content: {e.response.text}")
+        resp = getattr(e, "response", None)
+        text = getattr(resp, "text", "")
+        if text:
+            logger.error(f"Response content: {text}")
         return None
 
 def github_auth_required(view_function):
     """Decorator to require GitHub authentication."""
-    from functools import wraps
-    
     @wraps(view_function)
     def decorated_function(*args, **kwargs):
         # Check if user is authenticated through GitHub
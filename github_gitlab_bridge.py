@@ -12,7 +12,8 @@ Usage:
 Options:
     --direction=<direction>       Direction of the bridge: github-to-gitlab or gitlab-to-github
     --action=<action>             Action to perform: trigger-pipeline, update-status, sync-repo
-    --github-token=<token>        GitHub API token (or set GITHUB_TOKEN env var)
+    --github-token=<token>        GitHub API token, or comma-separated tokens to rotate through
+                                  (or set GITHUB_TOKENS / GITHUB_TOKEN env var)
     --gitlab-token=<token>        GitLab API token (or set GITLAB_TOKEN env var)
     --github-repo=<repo>          GitHub repository in the format "owner/repo"
     --gitlab-project=<project>    GitLab project ID or path
@@ -25,10 +26,27 @@ Example:
 import os
 import sys
 import json
+import time
+import hashlib
+import itertools
+import threading
 import logging
 import argparse
+import tempfile
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; it decodes and encodes API payloads several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +59,207 @@ logger = logging.getLogger("github-gitlab-bridge")
 GITHUB_API_BASE_URL = "https://api.github.com"
 GITLAB_API_BASE_URL = "https://gitlab.com/api/v4"
 
+# Kept at or above the widest thread pool fan-out so urllib3 never discards pooled sockets
+POOL_SIZE = 32
+
+# GitHub rate limits (403/429) are left to make_github_request, which caps the wait and rotates tokens;
+# urllib3 would otherwise retry any 429 carrying Retry-After on the same token and sleep it out uncapped
+GITHUB_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504],
+                     respect_retry_after_header=False)
+GITLAB_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+
+def _create_session(base_url, retry):
+    """Create a session for one API host with pooled keep-alive connections and retries on transient errors."""
+    session = requests.Session()
+    session.mount(base_url, HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry
+    ))
+    return session
+
+# One session per host so sockets stay warm across calls
+_GH_SESSION = _create_session("https://api.github.com", GITHUB_RETRY)
+_GL_SESSION = _create_session("https://gitlab.com", GITLAB_RETRY)
+
+# On-disk cache reused across CI runs (override with BRIDGE_CACHE_DIR)
+BRIDGE_CACHE_DIR = Path(os.environ.get("BRIDGE_CACHE_DIR") or Path.home() / ".cache" / "gh-gl-bridge")
+PIPELINE_CAPS_CACHE = "caps.json"
+PROJECT_MAP_CACHE = "project_map.json"
+GITHUB_ETAG_CACHE = "etags.json"
+
+# Upper bound on GitHub GET responses kept in the ETag cache; the oldest are dropped first
+GITHUB_ETAG_CACHE_SIZE = 256
+
+# Resolved GitLab projects are searched again after a day in case a project was renamed
+PROJECT_MAP_MAX_AGE = 24 * 60 * 60
+
+# Pipeline variable permissions are retried after a day in case a token was granted them
+PIPELINE_CAPS_MAX_AGE = 24 * 60 * 60
+
+def _load_cache(name, max_age=None):
+    """Load a JSON file from the bridge cache directory, or an empty dict if unavailable or older than max_age seconds."""
+    path = BRIDGE_CACHE_DIR / name
+    try:
+        if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+            return {}
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(name, data):
+    """Write a JSON file to the bridge cache directory; failures only log a warning."""
+    tmp_path = None
+    try:
+        BRIDGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write a private temp file and rename it over the cache, so concurrent
+        # processes and crashes never leave a half-written file behind
+        fd, tmp_path = tempfile.mkstemp(dir=BRIDGE_CACHE_DIR, prefix=f".{name}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, BRIDGE_CACHE_DIR / name)
+    except OSError as e:
+        logger.warning(f"Could not write bridge cache {name}: {str(e)}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Longest the bridge sleeps for a GitHub rate limit to reset before raising RateLimitError
+RATE_LIMIT_MAX_WAIT = 60
+
+# Epoch time at which each token's exhausted GitHub rate limit resets
+_rate_limit_resets = {}
+# Guards _rate_limit_resets and the token pools, which concurrent sync threads share
+_token_pool_lock = threading.Lock()
+
+class RateLimitError(requests.exceptions.RequestException):
+    """Raised when a GitHub token stays rate limited for longer than RATE_LIMIT_MAX_WAIT."""
+    
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        reset = datetime.fromtimestamp(reset_at, timezone.utc).isoformat(timespec="seconds")
+        super().__init__(f"GitHub rate limit exceeded until {reset}")
+
+# Seconds to back off when a Retry-After header cannot be parsed
+DEFAULT_RETRY_AFTER = 60
+
+def _retry_after_seconds(value):
+    """Parse a Retry-After header given as delay seconds or as an HTTP date."""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return max(0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+def _record_rate_limit(response, token):
+    """Remember when a token's rate limit resets; return True if the response was rate limited."""
+    headers = response.headers
+    limited = response.status_code in (403, 429)
+    
+    if limited and "Retry-After" in headers:
+        with _token_pool_lock:
+            _rate_limit_resets[token] = time.time() + _retry_after_seconds(headers["Retry-After"])
+        return True
+    
+    if headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+        with _token_pool_lock:
+            _rate_limit_resets[token] = int(headers["X-RateLimit-Reset"])
+        return limited
+    
+    return False
+
+def _wait_for_rate_limit(token):
+    """Sleep until a token's rate limit resets, or raise RateLimitError if that is too far away."""
+    reset_at = _rate_limit_resets.get(token)
+    if reset_at is None:
+        return
+    
+    wait = reset_at - time.time()
+    if wait > RATE_LIMIT_MAX_WAIT:
+        raise RateLimitError(reset_at)
+    
+    if wait > 0:
+        logger.warning(f"GitHub rate limit reached, waiting {wait:.0f}s for it to reset")
+        time.sleep(wait)
+    # Keep a newer reset another thread recorded while this one slept
+    with _token_pool_lock:
+        if _rate_limit_resets.get(token) == reset_at:
+            del _rate_limit_resets[token]
+
+# Round-robin iterator per comma-separated GitHub token pool
+_token_pools = {}
+
+def _next_github_token(tokens):
+    """Pick the next token from a comma-separated pool, skipping tokens that are rate limited."""
+    if "," not in tokens:
+        return tokens
+    
+    with _token_pool_lock:
+        if tokens not in _token_pools:
+            pool = [token.strip() for token in tokens.split(",") if token.strip()]
+            _token_pools[tokens] = (pool, itertools.cycle(pool))
+        pool, cycle = _token_pools[tokens]
+        
+        now = time.time()
+        for _ in range(len(pool)):
+            token = next(cycle)
+            if _rate_limit_resets.get(token, 0) <= now:
+                return token
+        
+        # Every token is rate limited, so use the one that resets first
+        return min(pool, key=lambda token: _rate_limit_resets.get(token, 0))
+
+def _dumps(data):
+    """Encode a request body as JSON bytes, or None when there is no body."""
+    if data is None:
+        return None
+    return orjson.dumps(data) if orjson else json.dumps(data).encode("utf-8")
+
+def _loads(content):
+    """Decode a JSON response body, or an empty dict when there is none."""
+    if not content:
+        return {}
+    return orjson.loads(content) if orjson else json.loads(content)
+
+def _token_scoped_key(value, token):
+    """Build a cache key for a value as seen by a specific token, without storing the token."""
+    return f"{value}:{hashlib.sha256(token.encode()).hexdigest()[:16]}"
+
+# ETag and body of earlier GitHub GETs, loaded from disk on first use and written back once per run
+_github_etags = None
+_github_etags_dirty = False
+_github_etags_lock = threading.Lock()
+
+def _get_github_etag(key):
+    """Return the cached {"etag", "body"} entry for a GitHub GET, if any."""
+    global _github_etags
+    with _github_etags_lock:
+        if _github_etags is None:
+            _github_etags = _load_cache(GITHUB_ETAG_CACHE)
+        return _github_etags.get(key)
+
+def _store_github_etag(key, etag, body):
+    """Remember a GitHub GET response so later requests, and the next run, can send If-None-Match."""
+    global _github_etags_dirty
+    with _github_etags_lock:
+        # Re-inserting moves the entry to the end, so eviction drops the least recently stored
+        _github_etags.pop(key, None)
+        _github_etags[key] = {"etag": etag, "body": body}
+        while len(_github_etags) > GITHUB_ETAG_CACHE_SIZE:
+            del _github_etags[next(iter(_github_etags))]
+        _github_etags_dirty = True
+
+def _flush_github_etags():
+    """Write the ETag cache to disk if it changed since it was loaded or last written."""
+    global _github_etags_dirty
+    with _github_etags_lock:
+        if _github_etags_dirty:
+            _save_cache(GITHUB_ETAG_CACHE, _github_etags)
+            _github_etags_dirty = False
+
 def get_github_token(args):
     """Get GitHub API token from args or environment variables."""
     # Handle both Namespace objects and dictionaries
@@ -51,8 +270,8 @@ def get_github_token(args):
     else:
         token = None
         
-    # Fall back to environment variable if no token in args
-    token = token or os.environ.get("GITHUB_TOKEN")
+    # Fall back to environment variables if no token in args
+    token = token or os.environ.get("GITHUB_TOKENS") or os.environ.get("GITHUB_TOKEN")
     if not token:
         raise ValueError("GitHub API token not provided in args or environment")
     return token
@@ -73,69 +292,116 @@ def get_gitlab_token(args):
         raise ValueError("GitLab API token not provided in args or environment")
     return token
 
-def make_github_request(endpoint, token, method="GET", data=None, params=None):
-    """Make a request to the GitHub API."""
-    url = f"{GITHUB_API_BASE_URL}/{endpoint}"
-    
-    headers = {
+@lru_cache(maxsize=32)
+def _github_headers(token):
+    """Build the GitHub request headers for a token once."""
+    return {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github.v3+json",
         "Content-Type": "application/json"
     }
+
+@lru_cache(maxsize=4)
+def _gitlab_headers(token):
+    """Build the GitLab request headers for a token once."""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+
+def make_github_request(endpoint, token, method="GET", data=None, params=None):
+    """Make a request to the GitHub API."""
+    url = f"{GITHUB_API_BASE_URL}/{endpoint}"
+    
+    # GETs revalidate with If-None-Match; a 304 is free of rate limit quota
+    cache_key = cached = None
+    if method == "GET":
+        cache_key = _token_scoped_key(f"{url}?{sorted((params or {}).items())}", token)
+        cached = _get_github_etag(cache_key)
     
     try:
-        response = None
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=data)
-        elif method == "PUT":
-            response = requests.put(url, headers=headers, json=data)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+        # Retry once after a rate limit response, on the next token of a pool if there is one;
+        # the wait either sleeps until the reset or raises RateLimitError
+        for attempt in range(2):
+            current = _next_github_token(token)
+            headers = _github_headers(current)
+            if cached:
+                headers = {**headers, "If-None-Match": cached["etag"]}
+            
+            _wait_for_rate_limit(current)
+            response = _GH_SESSION.request(method, url, headers=headers, data=_dumps(data), params=params)
+            if not _record_rate_limit(response, current):
+                break
+        
+        if response.status_code == 304 and cached:
+            return cached["body"]
         
         response.raise_for_status()
-        return response.json() if response.content else {}
+        result = _loads(response.content)
+        
+        if cache_key and "ETag" in response.headers:
+            _store_github_etag(cache_key, response.headers["ETag"], result)
+        
+        return result
     
     except requests.exceptions.RequestException as e:
         logger.error(f"GitHub API request failed: {str(e)}")
-        if hasattr(e, 'response') and e.response is not None and hasattr(e.response, 'text'):
-            logger.error(f"Response content: {e.response.text}")
+        resp = getattr(e, "response", None)
+        text = getattr(resp, "text", "")
+        if text:
+            logger.error(f"Response content: {text}")
         raise
 
 def make_gitlab_request(endpoint, token, method="GET", data=None, params=None):
     """Make a request to the GitLab API."""
     url = f"{GITLAB_API_BASE_URL}/{endpoint}"
+    headers = _gitlab_headers(token)
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+    try:
+        response = _GL_SESSION.request(method, url, headers=headers, data=_dumps(data), params=params)
+        response.raise_for_status()
+        return _loads(response.content)
+    
+    except requests.exceptions.RequestException as e:
+        logger.error(f"GitLab API request failed: {str(e)}")
+        resp = getattr(e, "response", None)
+        text = getattr(resp, "text", "")
+        if text:
+            logger.error(f"Response content: {text}")
+        raise
+
+def _latest_sha(github_repo, token):
+    """Return the SHA of the latest commit in a GitHub repository, or None if it has none."""
+    # The sha media type makes GitHub return only the 40-character SHA instead of a full commit object
+    url = f"{GITHUB_API_BASE_URL}/repos/{github_repo}/commits/HEAD"
+    token = _next_github_token(token)
+    headers = {**_github_headers(token), "Accept": "application/vnd.github.sha"}
     
     try:
-        response = None
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=data)
-        elif method == "PUT":
-            response = requests.put(url, headers=headers, json=data)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+        _wait_for_rate_limit(token)
+        response = _GH_SESSION.get(url, headers=headers)
+        _record_rate_limit(response, token)
+        
+        # GitHub answers 409 Conflict for a repository without commits
+        if response.status_code == 409:
+            return None
         
         response.raise_for_status()
-        return response.json() if response.content else {}
+        return response.text.strip() or None
     
     except requests.exceptions.RequestException as e:
-        logger.error(f"GitLab API request failed: {str(e)}")
-        if hasattr(e, 'response') and e.response is not None and hasattr(e.response, 'text'):
-            logger.error(f"Response content: {e.response.text}")
+        logger.error(f"GitHub API request failed: {str(e)}")
         raise
 
+def post_github_status(github_repo, token, commit_sha, status):
+    """Post a commit status to GitHub."""
+    return make_github_request(
+        f"repos/{github_repo}/statuses/{commit_sha}",
+        token,
+        method="POST",
+        data=status
+    )
+
 def github_to_gitlab_trigger_pipeline(args):
     """Trigger a GitLab CI/CD pipeline from GitHub."""
     logger.info("Triggering GitLab pipeline from GitHub...")
@@ -151,21 +417,29 @@ def github_to_gitlab_trigger_pipeline(args):
     else:
         gitlab_project = None
     
-    if not gitlab_project:
+    # Get github_repo from args or environment
+    if hasattr(args, 'github_repo'):
+        github_repo = args.github_repo
+    elif isinstance(args, dict) and 'github_repo' in args:
+        github_repo = args['github_repo']
+    else:
+        github_repo = None
+        
+    github_repo = github_repo or os.environ.get("GITHUB_REPOSITORY", "")
+    
+    if not gitlab_project and github_repo:
         # Try to find a GitLab project with a similar name to the GitHub repo
-        # Get github_repo from args or environment
-        if hasattr(args, 'github_repo'):
-            github_repo = args.github_repo
-        elif isinstance(args, dict) and 'github_repo' in args:
-            github_repo = args['github_repo']
+        # Extract the repo name without owner
+        repo_name = github_repo.split("/")[-1] if "/" in github_repo else github_repo
+        
+        # Reuse a project resolved by an earlier run before searching again
+        project_map = _load_cache(PROJECT_MAP_CACHE, max_age=PROJECT_MAP_MAX_AGE)
+        project_key = _token_scoped_key(repo_name, gitlab_token)
+        gitlab_project = project_map.get(project_key)
+        
+        if gitlab_project:
+            logger.info(f"Using cached GitLab project ID {gitlab_project} for GitHub repo {repo_name}")
         else:
-            github_repo = None
-            
-        github_repo = github_repo or os.environ.get("GITHUB_REPOSITORY", "")
-        if github_repo:
-            # Extract the repo name without owner
-            repo_name = github_repo.split("/")[-1] if "/" in github_repo else github_repo
-            
             # Search for GitLab projects
             try:
                 projects = make_gitlab_request(
@@ -177,6 +451,8 @@ def github_to_gitlab_trigger_pipeline(args):
                 if projects:
                     gitlab_project = projects[0]["id"]
                     logger.info(f"Found GitLab project with ID {gitlab_project} matching GitHub repo {repo_name}")
+                    project_map[project_key] = gitlab_project
+                    _save_cache(PROJECT_MAP_CACHE, project_map)
                 else:
                     logger.warning(f"No matching GitLab project found for GitHub repo {repo_name}")
             except Exception as e:
@@ -190,67 +466,76 @@ def github_to_gitlab_trigger_pipeline(args):
     github_run_id = os.environ.get("GITHUB_RUN_ID", "unknown")
     github_run_number = os.environ.get("GITHUB_RUN_NUMBER", "unknown")
     
+    # Resolve the latest GitHub commit while the pipeline is being triggered
+    executor = ThreadPoolExecutor(max_workers=1)
+    sha_future = executor.submit(_latest_sha, github_repo, github_token) if github_repo else None
+    executor.shutdown(wait=False)
+    
+    pipeline_data = {"ref": "main"}
+    pipeline_variables = [
+        {"key": "GITHUB_INTEGRATION", "value": "true"},
+        {"key": "GITHUB_WORKFLOW", "value": github_workflow},
+        {"key": "GITHUB_RUN_ID", "value": github_run_id},
+        {"key": "GITHUB_RUN_NUMBER", "value": github_run_number},
+        {"key": "GITHUB_REPOSITORY", "value": github_repo}
+    ]
+    
+    # Tokens already known to lack permission for pipeline variables skip the doomed first attempt
+    pipeline_caps = _load_cache(PIPELINE_CAPS_CACHE, max_age=PIPELINE_CAPS_MAX_AGE)
+    caps_key = _token_scoped_key(gitlab_project, gitlab_token)
+    
     # Trigger the GitLab pipeline
     try:
-        # First try with variables
-        try:
+        if pipeline_caps.get(caps_key, True):
+            # First try with variables
+            try:
+                result = make_gitlab_request(
+                    f"projects/{gitlab_project}/pipeline",
+                    gitlab_token,
+                    method="POST",
+                    data={**pipeline_data, "variables": pipeline_variables}
+                )
+            except requests.exceptions.RequestException as e:
+                # If we got a permission error about variables, try without them
+                resp = getattr(e, "response", None)
+                if resp is not None and resp.status_code == 400 and "Insufficient permissions to set pipeline variables" in resp.text:
+                    logger.warning("No permission to set pipeline variables, trying without variables...")
+                    pipeline_caps[caps_key] = False
+                    _save_cache(PIPELINE_CAPS_CACHE, pipeline_caps)
+                    result = make_gitlab_request(
+                        f"projects/{gitlab_project}/pipeline",
+                        gitlab_token, 
+                        method="POST",
+                        data=pipeline_data
+                    )
+                else:
+                    # Re-raise if it's not the specific permission error we're handling
+                    raise
+        else:
+            logger.info("Token cannot set pipeline variables for this project, triggering without variables...")
             result = make_gitlab_request(
                 f"projects/{gitlab_project}/pipeline",
                 gitlab_token,
                 method="POST",
-                data={
-                    "ref": "main",
-                    "variables": [
-                        {"key": "GITHUB_INTEGRATION", "value": "true"},
-                        {"key": "GITHUB_WORKFLOW", "value": github_workflow},
-                        {"key": "GITHUB_RUN_ID", "value": github_run_id},
-                        {"key": "GITHUB_RUN_NUMBER", "value": github_run_number},
-                        {"key": "GITHUB_REPOSITORY", "value": github_repo or os.environ.get("GITHUB_REPOSITORY", "")}
-                    ]
-                }
+                data=pipeline_data
             )
-        except requests.exceptions.RequestException as e:
-            # If we got a permission error about variables, try without them
-            if hasattr(e, 'response') and e.response is not None and e.response.status_code == 400 and "Insufficient permissions to set pipeline variables" in e.response.text:
-                logger.warning("No permission to set pipeline variables, trying without variables...")
-                result = make_gitlab_request(
-                    f"projects/{gitlab_project}/pipeline",
-                    gitlab_token, 
-                    method="POST",
-                    data={"ref": "main"}
-                )
-            else:
-                # Re-raise if it's not the specific permission error we're handling
-                raise
         
         logger.info(f"Successfully triggered GitLab pipeline: {result.get('id', 'N/A')}")
         logger.info(f"Pipeline URL: {result.get('web_url', 'N/A')}")
         
         # Update GitHub status
-        if github_repo:
+        if sha_future:
             try:
-                # Get the latest commit SHA
-                repo_info = make_github_request(
-                    f"repos/{github_repo}/commits",
-                    github_token,
-                    params={"per_page": 1}
-                )
+                commit_sha = sha_future.result()
                 
-                if repo_info and isinstance(repo_info, list) and len(repo_info) > 0:
-                    commit_sha = repo_info[0]["sha"]
-                    
+                if commit_sha:
                     # Create a commit status
-                    status_result = make_github_request(
-                        f"repos/{github_repo}/statuses/{commit_sha}",
-                        github_token,
-                        method="POST",
-                        data={
-                            "state": "success",
-                            "target_url": result.get("web_url", ""),
-                            "description": f"GitLab pipeline #{result.get('id', 'N/A')} triggered",
-                            "context": "gitlab-ci/pipeline"
-                        }
-                    )
+                    post_github_status(github_repo, github_token, commit_sha, {
+                        "state": "success",
+                        "target_url": result.get("web_url", ""),
+                        "description": f"GitLab pipeline #{result.get('id', 'N/A')} triggered",
+                        "context": "gitlab-ci/pipeline"
+                    })
                     
                     logger.info(f"Updated GitHub commit status for {commit_sha}")
             except Exception as e:
@@ -305,7 +590,7 @@ def gitlab_to_github_dispatch(args):
                     "gitlab_pipeline_id": gitlab_pipeline_id,
                     "gitlab_project_id": gitlab_project_id,
                     "gitlab_job_id": gitlab_job_id,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
         )
@@ -374,44 +659,45 @@ def sync_github_repo_to_gitlab(args):
             sync_info = {
                 "github_repository": github_repo,
                 "github_default_branch": github_repo_info.get("default_branch", "main"),
-                "last_synced": datetime.utcnow().isoformat(),
+                "last_synced": datetime.now(timezone.utc).isoformat(),
                 "sync_status": "success"
             }
             
-            # Base64 encode the content
-            import base64
-            content = base64.b64encode(json.dumps(sync_info, indent=2).encode()).decode()
+            # Serialize once; the same payload serves both the update and create attempts
+            payload = json.dumps(sync_info, indent=2)
             
-            # Try to update the file if it exists, otherwise create it
+            # Commit the file in a single request, updating it if it exists and creating it otherwise
             try:
-                # Check if file exists
-                make_gitlab_request(
-                    f"projects/{gitlab_project}/repository/files/github-sync-info.json",
-                    gitlab_token,
-                    params={"ref": "main"}
-                )
-                
-                # Update file
                 make_gitlab_request(
-                    f"projects/{gitlab_project}/repository/files/github-sync-info.json",
+                    f"projects/{gitlab_project}/repository/commits",
                     gitlab_token,
-                    method="PUT",
+                    method="POST",
                     data={
                         "branch": "main",
-                        "content": json.dumps(sync_info, indent=2),
-                        "commit_message": "Update GitHub sync information"
+                        "commit_message": "Update GitHub sync information",
+                        "actions": [{
+                            "action": "update",
+                            "file_path": "github-sync-info.json",
+                            "content": payload
+                        }]
                     }
                 )
-            except:
-                # Create file
+            except requests.exceptions.HTTPError as e:
+                # GitLab answers 400 when the file to update doesn't exist yet
+                if e.response is None or e.response.status_code != 400:
+                    raise
                 make_gitlab_request(
-                    f"projects/{gitlab_project}/repository/files/github-sync-info.json",
+                    f"projects/{gitlab_project}/repository/commits",
                     gitlab_token,
                     method="POST",
                     data={
                         "branch": "main",
-                        "content": json.dumps(sync_info, indent=2),
-                        "commit_message": "Add GitHub sync information"
+                        "commit_message": "Add GitHub sync information",
+                        "actions": [{
+                            "action": "create",
+                            "file_path": "github-sync-info.json",
+                            "content": payload
+                        }]
                     }
                 )
             
@@ -424,6 +710,10 @@ def sync_github_repo_to_gitlab(args):
     except Exception as e:
         logger.error(f"Failed to sync GitHub repository to GitLab: {str(e)}")
         raise
+    
+    finally:
+        # Also called from the web app, which never reaches main()
+        _flush_github_etags()
 
 def update_github_status_from_gitlab(args):
     """Update GitHub commit status based on GitLab CI/CD pipeline status."""
@@ -459,24 +749,21 @@ def update_github_status_from_gitlab(args):
         raise ValueError("GitLab pipeline ID not found in environment variables")
     
     try:
-        # Get pipeline details
-        pipeline = make_gitlab_request(
-            f"projects/{gitlab_project}/pipelines/{pipeline_id}",
-            gitlab_token
-        )
-        
-        # Get latest commit SHA from GitHub
-        commits = make_github_request(
-            f"repos/{github_repo}/commits",
-            github_token,
-            params={"per_page": 1}
-        )
+        # Get pipeline details and the latest GitHub commit SHA concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pipeline_future = executor.submit(
+                make_gitlab_request,
+                f"projects/{gitlab_project}/pipelines/{pipeline_id}",
+                gitlab_token
+            )
+            sha_future = executor.submit(_latest_sha, github_repo, github_token)
+            
+            pipeline = pipeline_future.result()
+            commit_sha = sha_future.result()
         
-        if not commits or not isinstance(commits, list) or len(commits) == 0:
+        if not commit_sha:
             raise ValueError("No commits found in GitHub repository")
         
-        commit_sha = commits[0]["sha"]
-        
         # Map GitLab pipeline status to GitHub commit status
         status_map = {
             "running": "pending",
@@ -489,17 +776,12 @@ def update_github_status_from_gitlab(args):
         github_status = status_map.get(pipeline.get("status", ""), "error")
         
         # Update GitHub commit status
-        make_github_request(
-            f"repos/{github_repo}/statuses/{commit_sha}",
-            github_token,
-            method="POST",
-            data={
-                "state": github_status,
-                "target_url": pipeline.get("web_url", ""),
-                "description": f"GitLab CI pipeline #{pipeline_id} {pipeline.get('status', 'unknown')}",
-                "context": "gitlab-ci/pipeline"
-            }
-        )
+        post_github_status(github_repo, github_token, commit_sha, {
+            "state": github_status,
+            "target_url": pipeline.get("web_url", ""),
+            "description": f"GitLab CI pipeline #{pipeline_id} {pipeline.get('status', 'unknown')}",
+            "context": "gitlab-ci/pipeline"
+        })
         
         logger.info(f"Successfully updated GitHub commit status to {github_status} for {commit_sha}")
         
@@ -538,7 +820,7 @@ def parse_arguments():
     
     parser.add_argument(
         "--github-token",
-        help="GitHub API token (or set GITHUB_TOKEN env var)"
+        help="GitHub API token, or comma-separated tokens to rotate through (or set GITHUB_TOKENS / GITHUB_TOKEN env var)"
     )
     
     parser.add_argument(
@@ -582,6 +864,9 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         return 1
+    
+    finally:
+        _flush_github_etags()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -1,18 +1,67 @@
 import os
+import time
 import requests
 import logging
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from requests.adapters import HTTPAdapter
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# orjson is optional; it parses JSON responses several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Logging is configured by the application (or the CLI entry point below), not on import
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Error response bodies are truncated to this many characters in log messages
+LOG_BODY_LIMIT = 512
 
 # Base URL for GitLab API
 GITLAB_API_BASE_URL = "https://gitlab.com/api/v4"
 
+# Shared session so repeated calls reuse pooled keep-alive connections; the pool holds a
+# connection for every update_ci_config worker (make_gitlab_request does its own retries)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+_METHOD_DISPATCH = {
+    "GET": _session.get,
+    "POST": _session.post,
+    "PUT": _session.put,
+    "DELETE": _session.delete,
+}
+
+# Last ETag and raw body per GET (token fingerprint, url, params), used for conditional requests
+# within this process; least recently used entries are evicted past ETAG_CACHE_SIZE
+ETAG_CACHE_SIZE = 256
+_etag_cache = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
+def _parse_json(content):
+    """Decode a JSON response body."""
+    return orjson.loads(content) if orjson else json.loads(content)
+
+def close_session():
+    """Close the shared GitLab session and its pooled connections."""
+    _session.close()
+
+# Token and request headers resolved by the first successful lookup; cleared on a 401
+_gitlab_token = None
+_gitlab_headers = None
+
 def get_gitlab_token():
     """Get the GitLab API token from the environment or the Flask app config."""
+    global _gitlab_token
+    if _gitlab_token:
+        return _gitlab_token
+    
     token = os.environ.get("GITLAB_TOKEN")
     
     # Alternative environment variable names
@@ -32,19 +81,49 @@ def get_gitlab_token():
         logger.error("GitLab API token not found in environment variables or app config")
         raise ValueError("GitLab API token not found in environment variables or app config")
     
+    _gitlab_token = token
     return token
 
+def get_gitlab_headers():
+    """Get the GitLab request headers, built once for the cached token."""
+    global _gitlab_headers
+    if _gitlab_headers is None:
+        _gitlab_headers = {
+            "Authorization": f"Bearer {get_gitlab_token()}",
+            "Content-Type": "application/json"
+        }
+    return _gitlab_headers
+
+def invalidate_gitlab_token():
+    """Forget the cached token and headers so the next request looks the token up again."""
+    global _gitlab_token, _gitlab_headers
+    _gitlab_token = None
+    _gitlab_headers = None
+    with _etag_cache_lock:
+        _etag_cache.clear()
+
 def make_gitlab_request(endpoint, method="GET", data=None, params=None, max_retries=3):
     """Make a request to the GitLab API with retry logic."""
-    token = get_gitlab_token()
     url = f"{GITLAB_API_BASE_URL}/{endpoint}"
+    headers = get_gitlab_headers()
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+    request_fn = _METHOD_DISPATCH.get(method)
+    if request_fn is None:
+        raise ValueError(f"Unsupported HTTP method: {method}")
     
-    logger.debug(f"Making GitLab API request to: {url}")
+    logger.debug("Making GitLab API request to: %s", url)
+    
+    # Revalidate GETs repeated within this process (e.g. by the web app) instead of downloading them again
+    cache_key = cached = None
+    if method == "GET":
+        token_id = hashlib.sha256(get_gitlab_token().encode()).hexdigest()[:16]
+        cache_key = (token_id, url, tuple(sorted((params or {}).items())))
+        with _etag_cache_lock:
+            cached = _etag_cache.get(cache_key)
+            if cached:
+                _etag_cache.move_to_end(cache_key)
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
     
     # Initialize retry counter
     retries = 0
@@ -52,70 +131,101 @@ def make_gitlab_request(endpoint, method="GET", data=None, params=None, max_retr
     
     while retries < max_retries:
         try:
-            if method == "GET":
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-            elif method == "POST":
-                response = requests.post(url, headers=headers, json=data, timeout=10)
-            elif method == "PUT":
-                response = requests.put(url, headers=headers, json=data, timeout=10)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=headers, timeout=10)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            response = request_fn(url, headers=headers, params=params, json=data, timeout=10)
             
             # Log the response status
-            logger.debug(f"GitLab API response status: {response.status_code}")
+            logger.debug("GitLab API response status: %d", response.status_code)
             
             # Check if the token is invalid
             if response.status_code == 401:
                 logger.error("GitLab API token is invalid or expired")
+                invalidate_gitlab_token()
                 return {
                     "status": "error", 
                     "message": "GitLab API token is invalid or expired. Please update your token."
                 }
             
+            # Unchanged since the last fetch: parse the cached body, so each caller gets its own copy
+            if response.status_code == 304 and cached:
+                return _parse_json(cached[1])
+            
             response.raise_for_status()
             
-            # Handle responses without JSON content
-            if response.status_code == 204 or not response.text.strip():
+            # Handle responses without JSON content; checking the raw bytes avoids decoding
+            # (and charset-detecting) the whole body into a str before it is parsed anyway
+            if response.status_code == 204 or not response.content.strip():
                 return {"status": "success", "status_code": response.status_code}
             
-            return response.json()
+            result = _parse_json(response.content)
+            
+            if cache_key and "ETag" in response.headers:
+                with _etag_cache_lock:
+                    _etag_cache[cache_key] = (response.headers["ETag"], response.content)
+                    _etag_cache.move_to_end(cache_key)
+                    if len(_etag_cache) > ETAG_CACHE_SIZE:
+                        _etag_cache.popitem(last=False)
+            
+            return result
             
         except requests.exceptions.RequestException as e:
             last_exception = e
             retries += 1
-            logger.warning(f"GitLab API request failed (attempt {retries}/{max_retries}): {str(e)}")
+            logger.warning("GitLab API request failed (attempt %d/%d): %s", retries, max_retries, e)
             
             if hasattr(e, 'response') and e.response is not None:
-                if hasattr(e.response, 'text'):
-                    logger.warning(f"Response content: {e.response.text}")
+                logger.warning("Response content: %s", e.response.content[:LOG_BODY_LIMIT].decode("utf-8", errors="replace"))
                 
                 # If we get a 401 Unauthorized, no point in retrying
                 if e.response.status_code == 401:
                     logger.error("GitLab API token is invalid or expired")
+                    invalidate_gitlab_token()
                     return {
                         "status": "error", 
                         "message": "GitLab API token is invalid or expired. Please update your token."
                     }
+                
+                # Other client errors fail the same way every time; only 429 is worth retrying
+                if 400 <= e.response.status_code < 500 and e.response.status_code != 429:
+                    break
             
-            # Only sleep if we're going to retry
+            # Only sleep if we're going to retry, backing off exponentially (0.5s, 1s, 2s, ... up to 8s)
             if retries < max_retries:
-                import time
-                time.sleep(1)  # Wait 1 second before retrying
+                time.sleep(min(0.5 * 2 ** (retries - 1), 8))
     
     # If we've exhausted all retries, log the error and raise the exception
-    logger.error(f"GitLab API request failed after {max_retries} attempts")
+    logger.error("GitLab API request failed after %d attempts", retries)
     if last_exception:
         # Return error information instead of raising an exception
         error_message = str(last_exception)
-        logger.error(f"Final error: {error_message}")
-        return {"status": "error", "message": error_message}
+        logger.error("Final error: %s", error_message)
+        error = {"status": "error", "message": error_message}
+        
+        # Let callers branch on the HTTP status, e.g. to create a file an update didn't find
+        response = getattr(last_exception, "response", None)
+        if response is not None:
+            error["status_code"] = response.status_code
+        return error
 
 def get_gitlab_projects():
     """Get a list of GitLab projects for the authenticated user."""
     return make_gitlab_request("projects", params={"membership": True})
 
+def iter_gitlab_projects(per_page=100):
+    """Yield every GitLab project the authenticated user is a member of, one page at a time."""
+    # Keyset pagination on the project ID: each page starts after the last ID already seen
+    params = {"membership": True, "per_page": per_page, "order_by": "id", "sort": "asc"}
+    
+    while True:
+        page = make_gitlab_request("projects", params=params)
+        if isinstance(page, dict) and page.get("status") == "error":
+            raise ValueError(page.get("message", "Unknown GitLab API error"))
+        
+        yield from page
+        
+        if len(page) < per_page:
+            return
+        params = {**params, "id_after": page[-1]["id"]}
+
 def get_gitlab_project(project_id):
     """Get details for a specific GitLab project."""
     return make_gitlab_request(f"projects/{project_id}")
@@ -148,92 +258,101 @@ def create_gitlab_project(name, description=""):
         }
     )
 
-def update_ci_config():
-    """Update GitLab CI configuration for all accessible projects."""
+# Basic CI/CD configuration for integration with GitHub
+_CI_CONFIG = {
+    "stages": ["build", "test", "deploy"],
+    "variables": {
+        "GITHUB_INTEGRATION": "enabled"
+    },
+    "build": {
+        "stage": "build",
+        "script": [
+            "echo 'Building project...'",
+            "# Build commands go here"
+        ]
+    },
+    "test": {
+        "stage": "test",
+        "script": [
+            "echo 'Running tests...'",
+            "# Test commands go here"
+        ]
+    },
+    "deploy": {
+        "stage": "deploy",
+        "script": [
+            "echo 'Deploying application...'",
+            "# Deployment commands go here"
+        ],
+        "only": ["main"]
+    }
+}
+
+# The configuration is the same for every project, so serialize it once
+_CI_CONFIG_JSON = json.dumps(_CI_CONFIG, indent=2)
+
+def _ci_config_commit(action, ci_config_json):
+    """Build a commits API payload that writes .gitlab-ci.yml with the given action."""
+    return {
+        "branch": "main",
+        "commit_message": "Update CI configuration via DevOps AI System",
+        "actions": [{
+            "action": action,
+            "file_path": ".gitlab-ci.yml",
+            "content": ci_config_json
+        }]
+    }
+
+def _upsert_ci_config(project, ci_config_json):
+    """Create or update the .gitlab-ci.yml file of one project; return True on success."""
+    endpoint = f"projects/{project['id']}/repository/commits"
+    
+    # Update first, since the file exists on every run after the first;
+    # GitLab rejects the commit with 400 when there is no file to update yet
+    result = make_gitlab_request(endpoint, method="POST", data=_ci_config_commit("update", ci_config_json))
+    if result.get("status") != "error":
+        logger.info("Updated existing CI configuration for project %s", project["name"])
+        return True
+    
+    if result.get("status_code") == 400:
+        result = make_gitlab_request(endpoint, method="POST", data=_ci_config_commit("create", ci_config_json))
+        if result.get("status") != "error":
+            logger.info("Created CI configuration for project %s", project["name"])
+            return True
+    
+    logger.error("Failed to update CI configuration for project %s: %s", project["name"], result.get("message"))
+    return False
+
+def update_ci_config(max_workers=16):
+    """Update GitLab CI configuration for all accessible projects, several projects at a time."""
     try:
-        projects = get_gitlab_projects()
-        updated_count = 0
-        
-        for project in projects:
-            project_id = project["id"]
-            
-            # Basic CI/CD configuration for integration with GitHub
-            ci_config = {
-                "stages": ["build", "test", "deploy"],
-                "variables": {
-                    "GITHUB_INTEGRATION": "enabled"
-                },
-                "build": {
-                    "stage": "build",
-                    "script": [
-                        "echo 'Building project...'",
-                        "# Build commands go here"
-                    ]
-                },
-                "test": {
-                    "stage": "test",
-                    "script": [
-                        "echo 'Running tests...'",
-                        "# Test commands go here"
-                    ]
-                },
-                "deploy": {
-                    "stage": "deploy",
-                    "script": [
-                        "echo 'Deploying application...'",
-                        "# Deployment commands go here"
-                    ],
-                    "only": ["main"]
-                }
-            }
-            
-            try:
-                # Create or update .gitlab-ci.yml file in the repository
-                make_gitlab_request(
-                    f"projects/{project_id}/repository/files/.gitlab-ci.yml",
-                    method="POST",
-                    data={
-                        "branch": "main",
-                        "content": json.dumps(ci_config, indent=2),
-                        "commit_message": "Update CI configuration via DevOps AI System"
-                    }
-                )
-                updated_count += 1
-                logger.info(f"Updated CI configuration for project {project['name']}")
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 400:
-                    # File already exists, update it
-                    try:
-                        make_gitlab_request(
-                            f"projects/{project_id}/repository/files/.gitlab-ci.yml",
-                            method="PUT",
-                            data={
-                                "branch": "main",
-                                "content": json.dumps(ci_config, indent=2),
-                                "commit_message": "Update CI configuration via DevOps AI System"
-                            }
-                        )
-                        updated_count += 1
-                        logger.info(f"Updated existing CI configuration for project {project['name']}")
-                    except Exception as update_error:
-                        logger.error(f"Failed to update CI configuration for project {project['name']}: {str(update_error)}")
-                else:
-                    logger.error(f"Failed to create CI configuration for project {project['name']}: {str(e)}")
+        # max_workers stays within the session's pool_maxsize of 20; updates
+        # for the first page of projects start while later pages are still being fetched
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda project: _upsert_ci_config(project, _CI_CONFIG_JSON),
+                iter_gitlab_projects()
+            ))
         
-        return {"status": "success", "updated_projects": updated_count}
+        return {"status": "success", "updated_projects": sum(results)}
     
     except Exception as e:
-        logger.error(f"Failed to update CI configurations: {str(e)}")
+        logger.error("Failed to update CI configurations: %s", e)
         return {"status": "error", "message": str(e)}
 
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=logging.DEBUG)
+    
     if len(sys.argv) > 1:
         command = sys.argv[1]
         
         if command == "update_ci_config":
-            result = update_ci_config()
+            try:
+                result = update_ci_config()
+            finally:
+                close_session()
             print(json.dumps(result, indent=2))
         else:
             print(f"Unknown command: {command}")
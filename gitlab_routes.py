@@ -41,9 +41,9 @@ def get_projects():
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        projects = controller.get_projects()
-        return jsonify(projects)
+        with GitLabController(token=token) as controller:
+            projects = controller.get_projects()
+            return jsonify(projects)
     except Exception as e:
         logger.error(f"Error getting GitLab projects: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -60,9 +60,9 @@ def get_project(project_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        project = controller.get_project(project_id)
-        return jsonify(project)
+        with GitLabController(token=token) as controller:
+            project = controller.get_project(project_id)
+            return jsonify(project)
     except Exception as e:
         logger.error(f"Error getting GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -83,13 +83,13 @@ def create_project():
         return jsonify({"error": "Project name is required"}), 400
     
     try:
-        controller = GitLabController(token=token)
-        project = controller.create_project(
-            name=data['name'],
-            description=data.get('description', ''),
-            visibility=data.get('visibility', 'private')
-        )
-        return jsonify(project), 201
+        with GitLabController(token=token) as controller:
+            project = controller.create_project(
+                name=data['name'],
+                description=data.get('description', ''),
+                visibility=data.get('visibility', 'private')
+            )
+            return jsonify(project), 201
     except Exception as e:
         logger.error(f"Error creating GitLab project: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -106,15 +106,15 @@ def get_pipelines(project_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        status = request.args.get('status')
-        ref = request.args.get('ref')
-        pipelines = controller.get_pipelines(
-            project_id, 
-            status=status,
-            ref=ref
-        )
-        return jsonify(pipelines)
+        with GitLabController(token=token) as controller:
+            status = request.args.get('status')
+            ref = request.args.get('ref')
+            pipelines = controller.get_pipelines(
+                project_id, 
+                status=status,
+                ref=ref
+            )
+            return jsonify(pipelines)
     except Exception as e:
         logger.error(f"Error getting GitLab pipelines for project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -135,13 +135,13 @@ def trigger_pipeline(project_id):
     variables = data.get('variables')
     
     try:
-        controller = GitLabController(token=token)
-        pipeline = controller.trigger_pipeline(
-            project_id,
-            ref=ref,
-            variables=variables
-        )
-        return jsonify(pipeline), 201
+        with GitLabController(token=token) as controller:
+            pipeline = controller.trigger_pipeline(
+                project_id,
+                ref=ref,
+                variables=variables
+            )
+            return jsonify(pipeline), 201
     except Exception as e:
         logger.error(f"Error triggering GitLab pipeline for project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -158,9 +158,9 @@ def get_pipeline(project_id, pipeline_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        pipeline = controller.get_pipeline(project_id, pipeline_id)
-        return jsonify(pipeline)
+        with GitLabController(token=token) as controller:
+            pipeline = controller.get_pipeline(project_id, pipeline_id)
+            return jsonify(pipeline)
     except Exception as e:
         logger.error(f"Error getting GitLab pipeline {pipeline_id} for project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -177,9 +177,9 @@ def get_pipeline_jobs(project_id, pipeline_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        jobs = controller.get_pipeline_jobs(project_id, pipeline_id)
-        return jsonify(jobs)
+        with GitLabController(token=token) as controller:
+            jobs = controller.get_pipeline_jobs(project_id, pipeline_id)
+            return jsonify(jobs)
     except Exception as e:
         logger.error(f"Error getting jobs for GitLab pipeline {pipeline_id} in project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -196,9 +196,9 @@ def cancel_pipeline(project_id, pipeline_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.cancel_pipeline(project_id, pipeline_id)
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.cancel_pipeline(project_id, pipeline_id)
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error canceling GitLab pipeline {pipeline_id} in project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -215,9 +215,9 @@ def retry_pipeline(project_id, pipeline_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.retry_pipeline(project_id, pipeline_id)
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.retry_pipeline(project_id, pipeline_id)
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error retrying GitLab pipeline {pipeline_id} in project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -236,13 +236,13 @@ def get_file_content(project_id, file_path):
     ref = request.args.get('ref', 'main')
     
     try:
-        controller = GitLabController(token=token)
-        content = controller.get_file_content(project_id, file_path, ref=ref)
+        with GitLabController(token=token) as controller:
+            content = controller.get_file_content(project_id, file_path, ref=ref)
         
-        if content is None:
-            return jsonify({"error": "File not found"}), 404
+            if content is None:
+                return jsonify({"error": "File not found"}), 404
         
-        return jsonify({"content": content})
+            return jsonify({"content": content})
     except Exception as e:
         logger.error(f"Error getting file {file_path} from GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -267,15 +267,15 @@ def update_file(project_id, file_path):
     branch = data.get('branch', 'main')
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.create_or_update_file(
-            project_id,
-            file_path,
-            content,
-            commit_message,
-            branch=branch
-        )
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.create_or_update_file(
+                project_id,
+                file_path,
+                content,
+                commit_message,
+                branch=branch
+            )
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error updating file {file_path} in GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -296,14 +296,14 @@ def delete_file(project_id, file_path):
     branch = data.get('branch', 'main')
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.delete_file(
-            project_id,
-            file_path,
-            commit_message,
-            branch=branch
-        )
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.delete_file(
+                project_id,
+                file_path,
+                commit_message,
+                branch=branch
+            )
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error deleting file {file_path} from GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -324,14 +324,14 @@ def get_repository_tree(project_id):
     recursive = request.args.get('recursive', 'false').lower() == 'true'
     
     try:
-        controller = GitLabController(token=token)
-        tree = controller.get_repository_tree(
-            project_id,
-            path=path,
-            ref=ref,
-            recursive=recursive
-        )
-        return jsonify(tree)
+        with GitLabController(token=token) as controller:
+            tree = controller.get_repository_tree(
+                project_id,
+                path=path,
+                ref=ref,
+                recursive=recursive
+            )
+            return jsonify(tree)
     except Exception as e:
         logger.error(f"Error getting repository tree for GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -354,9 +354,9 @@ def setup_ci_cd(project_id):
     ci_config_content = data['content']
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.setup_gitlab_ci_cd(project_id, ci_config_content)
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.setup_gitlab_ci_cd(project_id, ci_config_content)
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error setting up CI/CD for GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -379,9 +379,9 @@ def setup_pages(project_id):
     index_html_content = data['content']
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.setup_gitlab_pages(project_id, index_html_content)
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.setup_gitlab_pages(project_id, index_html_content)
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error setting up GitLab Pages for project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -405,13 +405,13 @@ def sync_github_repo(project_id):
     github_branch = data.get('github_branch', 'main')
     
     try:
-        controller = GitLabController(token=token)
-        result = controller.sync_github_repo_to_gitlab(
-            project_id,
-            github_repo,
-            github_branch=github_branch
-        )
-        return jsonify(result)
+        with GitLabController(token=token) as controller:
+            result = controller.sync_github_repo_to_gitlab(
+                project_id,
+                github_repo,
+                github_branch=github_branch
+            )
+            return jsonify(result)
     except Exception as e:
         logger.error(f"Error syncing GitHub repository to GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -428,9 +428,9 @@ def get_environments(project_id):
         }), 401
     
     try:
-        controller = GitLabController(token=token)
-        environments = controller.get_environments(project_id)
-        return jsonify(environments)
+        with GitLabController(token=token) as controller:
+            environments = controller.get_environments(project_id)
+            return jsonify(environments)
     except Exception as e:
         logger.error(f"Error getting environments for GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -454,13 +454,13 @@ def create_environment(project_id):
     external_url = data.get('external_url')
     
     try:
-        controller = GitLabController(token=token)
-        environment = controller.create_environment(
-            project_id,
-            name,
-            external_url=external_url
-        )
-        return jsonify(environment), 201
+        with GitLabController(token=token) as controller:
+            environment = controller.create_environment(
+                project_id,
+                name,
+                external_url=external_url
+            )
+            return jsonify(environment), 201
     except Exception as e:
         logger.error(f"Error creating environment for GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -479,12 +479,12 @@ def get_deployments(project_id):
     environment = request.args.get('environment')
     
     try:
-        controller = GitLabController(token=token)
-        deployments = controller.get_deployments(
-            project_id,
-            environment=environment
-        )
-        return jsonify(deployments)
+        with GitLabController(token=token) as controller:
+            deployments = controller.get_deployments(
+                project_id,
+                environment=environment
+            )
+            return jsonify(deployments)
     except Exception as e:
         logger.error(f"Error getting deployments for GitLab project {project_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,38 @@
+import unittest
+
+from ai_model import find_most_similar_query
+
+# Fixed queries and the intent each must keep resolving to
+EXPECTED_INTENTS = [
+    ("How can I create a GitHub repository?", "github_repo"),
+    ("trigger a pipeline", "gitlab_pipeline"),
+    ("ci/cd", "gitlab_pipeline"),
+    ("how do I deploy with gitlab", "gitlab_deploy"),
+    ("merge request", "gitlab_merge"),
+    ("api token gitlab", "gitlab_auth"),
+    ("set up github actions for my repo", "github_actions"),
+    ("github pages setup", "github_pages"),
+    ("codespaces", "github_codespaces"),
+    ("publish a package", "github_packages"),
+    ("continuous integration", "devops_info"),
+    ("connect github to gitlab", "integration"),
+    ("list my projects", "projects"),
+    ("recent actions", "actions"),
+    ("create project", "project_create"),
+    ("what can you do", "help"),
+    # Nothing in common with the training data falls back to help
+    ("hello", "help"),
+    ("kubernetes", "help"),
+    ("terraform", "help"),
+]
+
+
+class FindMostSimilarQueryTest(unittest.TestCase):
+    def test_fixed_queries_keep_their_intents(self):
+        for query, intent in EXPECTED_INTENTS:
+            with self.subTest(query=query):
+                self.assertEqual(find_most_similar_query(query), intent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import http.server
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import github_gitlab_bridge as bridge
+
+
+class NextGithubTokenTest(unittest.TestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.dict(bridge._token_pools, clear=True),
+            mock.patch.dict(bridge._rate_limit_resets, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_single_token_is_returned_as_is(self):
+        self.assertEqual(bridge._next_github_token("only"), "only")
+
+    def test_pool_rotates_round_robin(self):
+        picks = [bridge._next_github_token("a, b") for _ in range(4)]
+        self.assertEqual(picks, ["a", "b", "a", "b"])
+
+    def test_rate_limited_token_is_skipped(self):
+        bridge._rate_limit_resets["a"] = time.time() + 60
+        picks = [bridge._next_github_token("a,b") for _ in range(3)]
+        self.assertEqual(picks, ["b", "b", "b"])
+
+    def test_all_limited_picks_earliest_reset(self):
+        bridge._rate_limit_resets["a"] = time.time() + 120
+        bridge._rate_limit_resets["b"] = time.time() + 30
+        self.assertEqual(bridge._next_github_token("a,b"), "b")
+
+
+class RateLimitedHandler(http.server.BaseHTTPRequestHandler):
+    """Answer GETs with a 429 unless the token is in ok_tokens, recording the Authorization header of each hit."""
+
+    hits = []
+    ok_tokens = ()
+    retry_after = "0"
+
+    def do_GET(self):
+        auth = self.headers.get("Authorization")
+        self.hits.append(auth)
+        if auth.split()[-1] in self.ok_tokens:
+            self.send_response(200)
+        else:
+            self.send_response(429)
+            self.send_header("Retry-After", self.retry_after)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class MakeGithubRequestRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        RateLimitedHandler.hits = []
+        RateLimitedHandler.ok_tokens = ()
+        RateLimitedHandler.retry_after = "0"
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # Point the bridge at the local server through a session built like the real GitHub one
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        session = bridge._create_session(base_url, bridge.GITHUB_RETRY)
+        self.addCleanup(session.close)
+        patchers = [
+            mock.patch.object(bridge, "GITHUB_API_BASE_URL", base_url),
+            mock.patch.object(bridge, "_GH_SESSION", session),
+            mock.patch.object(bridge, "_github_etags", {}),
+            mock.patch.dict(bridge._token_pools, clear=True),
+            mock.patch.dict(bridge._rate_limit_resets, clear=True),
+            mock.patch.object(bridge.logger, "error"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_429_is_handled_by_the_bridge_not_the_adapter(self):
+        with self.assertRaises(requests.exceptions.HTTPError) as raised:
+            bridge.make_github_request("repos/a/b", "only")
+
+        # One request plus the bridge's own retry; urllib3 retrying the 429 would add three more
+        self.assertEqual(raised.exception.response.status_code, 429)
+        self.assertEqual(len(RateLimitedHandler.hits), 2)
+
+    def test_rate_limited_token_rotates_to_the_next_in_the_pool(self):
+        RateLimitedHandler.ok_tokens = ("b",)
+        RateLimitedHandler.retry_after = "3600"
+
+        self.assertEqual(bridge.make_github_request("repos/a/b", "a,b"), {})
+
+        self.assertEqual(RateLimitedHandler.hits, ["token a", "token b"])
+        self.assertIn("a", bridge._rate_limit_resets)
+
+
+if __name__ == '__main__':
+    unittest.main()
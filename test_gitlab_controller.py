@@ -0,0 +1,116 @@
+import json
+import unittest
+from unittest import mock
+
+import requests
+
+from gitlab_controller import GitLabController
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response as used by GitLabController."""
+
+    def __init__(self, status_code=200, body=None, headers=None, links=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b''
+        self.headers = headers or {}
+        self.links = links or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+
+class GitLabControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.controller, self.request = self._controller()
+
+    def _controller(self, **kwargs):
+        """Build a controller whose session requests are mocked."""
+        controller = GitLabController(token="test-token", rate_limit=0, **kwargs)
+        patcher = mock.patch.object(controller.session, 'request')
+        request = patcher.start()
+        self.addCleanup(patcher.stop)
+        return controller, request
+
+    def test_get_pipelines_returns_first_page_by_default(self):
+        self.request.return_value = FakeResponse(
+            body=[{'id': 2}], links={'next': {'url': 'https://gitlab.com/api/v4/projects/1/pipelines?page=2'}}
+        )
+
+        self.assertEqual(self.controller.get_pipelines(1), [{'id': 2}])
+        self.assertEqual(self.request.call_count, 1)
+        self.assertNotIn('per_page', self.request.call_args.kwargs['params'])
+
+    def test_get_pipelines_all_pages_follows_next_links(self):
+        next_url = 'https://gitlab.com/api/v4/projects/1/pipelines?page=2'
+        self.request.side_effect = [
+            FakeResponse(body=[{'id': 2}], links={'next': {'url': next_url}}),
+            FakeResponse(body=[{'id': 1}]),
+        ]
+
+        self.assertEqual(self.controller.get_pipelines(1, all_pages=True), [{'id': 2}, {'id': 1}])
+        self.assertEqual(self.request.call_args_list[1].args[1], next_url)
+
+    def test_not_modified_response_reuses_cached_body(self):
+        self.request.side_effect = [
+            FakeResponse(body={'id': 7}, headers={'ETag': '"v1"'}),
+            FakeResponse(status_code=304),
+        ]
+
+        first = self.controller.get_pipeline(1, 7)
+        second = self.controller.get_pipeline(1, 7)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.request.call_args_list[1].kwargs['headers'], {'If-None-Match': '"v1"'})
+
+    def test_reads_are_not_cached_by_default(self):
+        self.request.side_effect = [
+            FakeResponse(body={'id': 1, 'description': 'old'}),
+            FakeResponse(body={'id': 1, 'description': 'new'}),
+        ]
+
+        self.controller.get_project(1)
+        self.assertEqual(self.controller.get_project(1)['description'], 'new')
+        self.assertEqual(self.request.call_count, 2)
+
+    def test_write_invalidates_cached_reads_of_the_project(self):
+        controller, request = self._controller(cache_ttl=60)
+        request.side_effect = [
+            FakeResponse(body={'id': 1, 'description': 'old'}),
+            FakeResponse(body={'id': 1, 'description': 'new'}),
+            FakeResponse(body={'id': 1, 'description': 'new'}),
+        ]
+
+        controller.get_project(1)
+        controller.get_project(1)
+        self.assertEqual(request.call_count, 1)
+
+        controller.update_project(1, {'description': 'new'})
+        self.assertEqual(controller.get_project(1)['description'], 'new')
+        self.assertEqual(request.call_count, 3)
+
+    def test_create_or_update_file_falls_back_to_post(self):
+        self.request.side_effect = [
+            FakeResponse(status_code=400, body={'message': "A file with this name doesn't exist"}),
+            FakeResponse(status_code=201, body={'file_path': 'a/b.txt'}),
+        ]
+
+        with mock.patch('sys.stderr'):
+            result = self.controller.create_or_update_file(1, 'a/b.txt', 'hello', 'Add file')
+
+        self.assertEqual(result, {'file_path': 'a/b.txt'})
+        methods = [call.args[0] for call in self.request.call_args_list]
+        self.assertEqual(methods, ['PUT', 'POST'])
+        self.assertTrue(self.request.call_args.args[1].endswith('/repository/files/a%2Fb.txt'))
+
+    def test_create_or_update_file_with_known_state_sends_one_request(self):
+        self.request.return_value = FakeResponse(body={'file_path': 'a.txt'})
+
+        self.controller.create_or_update_file(1, 'a.txt', 'hello', 'Update file', file_exists=True)
+
+        self.assertEqual([call.args[0] for call in self.request.call_args_list], ['PUT'])
+
+
+if __name__ == '__main__':
+    unittest.main()